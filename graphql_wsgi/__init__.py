@@ -1 +1,7 @@
 from .main import graphql_wsgi, graphql_wsgi_dynamic
+from .cache import CacheControlField, ResolverCache, PUBLIC, PRIVATE
+from .memory import MemoryProfiler
+from .normalize import normalize, document_hash
+from .ratelimit import RateLimiter, TokenBucketStore, SQLiteTokenBucketStore
+from .registry import SchemaRegistry
+from .slowlog import SlowLog, slow_log_wsgi
@@ -0,0 +1,98 @@
+"""Running coroutine resolvers on a shared background event loop.
+
+Each worker process gets a single event loop running in a daemon
+thread. Coroutines returned by resolvers are scheduled on that loop, so
+they run concurrently, while the WSGI thread waits for the operation to
+complete.
+"""
+import os
+import threading
+
+try:
+    import asyncio
+    from concurrent.futures import FIRST_COMPLETED, wait
+except ImportError:  # Python 2
+    asyncio = None
+
+from promise import Promise
+
+from .deadline import DeadlineExceeded
+
+
+_lock = threading.Lock()
+_loop = None
+_loop_pid = None
+
+
+def background_loop():
+    """Return the event loop of this process, starting it if needed."""
+    global _loop, _loop_pid
+    if asyncio is None:
+        raise RuntimeError('Async resolvers require asyncio.')
+    with _lock:
+        # a forked worker does not inherit the thread running the loop
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            thread = threading.Thread(target=_loop.run_forever,
+                                      name='graphql-wsgi-loop')
+            thread.daemon = True
+            thread.start()
+        return _loop
+
+
+class BackgroundLoopExecutor(object):
+    """graphql-core executor running coroutine results on a loop.
+
+    It also acts as middleware, which must be the innermost one and
+    used with ``wrap_in_promise=False``, so other middleware sees a
+    promise rather than a coroutine. If a ``deadline`` is given, waiting stops
+    when it expires and resolvers still running are cancelled.
+    """
+    def __init__(self, loop, deadline=None):
+        self.loop = loop
+        self.deadline = deadline
+        self.pending = {}
+
+    def schedule(self, result):
+        if not asyncio.iscoroutine(result):
+            return result
+        future = asyncio.run_coroutine_threadsafe(result, self.loop)
+        promise = Promise()
+        self.pending[future] = promise
+        return promise
+
+    def execute(self, fn, *args, **kwargs):
+        return self.schedule(fn(*args, **kwargs))
+
+    def resolve(self, next, root, args, context, info):
+        # like the default wrap_in_promise, always give middleware a promise
+        return Promise.resolve(self.schedule(next(root, args, context, info)))
+
+    def wait_until_finished(self):
+        while self.pending:
+            timeout = None
+            if self.deadline is not None:
+                timeout = self.deadline.remaining()
+            done, not_done = wait(list(self.pending), timeout=timeout,
+                                  return_when=FIRST_COMPLETED)
+            if not done:
+                self.cancel()
+                continue
+            # resolving promises can run further resolvers, which add
+            # to pending
+            for future in done:
+                promise = self.pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    promise.do_reject(e)
+                else:
+                    promise.do_resolve(value)
+
+    def cancel(self):
+        pending, self.pending = self.pending, {}
+        for future, promise in pending.items():
+            future.cancel()
+            self.deadline.skipped += 1
+            promise.do_reject(DeadlineExceeded())
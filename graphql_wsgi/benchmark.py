@@ -0,0 +1,137 @@
+"""Benchmark graphql_wsgi with synthetic schemas and queries.
+
+Run with ``python -m graphql_wsgi.benchmark``. For every scenario a
+synthetic schema and query are generated (see
+:mod:`graphql_wsgi.synthetic`) and the query is sent through the WSGI
+app repeatedly. Reported are latency percentiles, throughput, the peak
+memory allocated by a single request and the response size.
+"""
+import argparse
+import json
+import sys
+from timeit import default_timer as clock
+
+from six.moves.urllib.parse import urlencode
+from webob.request import Request
+
+from .main import graphql_wsgi
+from .synthetic import synthetic_schema, synthetic_query
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+SCENARIOS = [
+    {'name': 'small',
+     'schema': {'types': 10},
+     'query': {'depth': 2}},
+    {'name': 'wide schema',
+     'schema': {'types': 2000, 'fields': 20},
+     'query': {'depth': 2}},
+    {'name': 'wide query',
+     'schema': {'types': 100, 'fields': 20},
+     'query': {'depth': 2, 'fields': 20}},
+    {'name': 'deep query',
+     'schema': {'types': 100},
+     'query': {'depth': 8, 'lists': False}},
+    {'name': 'large lists',
+     'schema': {'types': 100, 'list_size': 10},
+     'query': {'depth': 3, 'links': 2}},
+    {'name': 'fragments',
+     'schema': {'types': 100, 'list_size': 10},
+     'query': {'depth': 3, 'links': 2, 'fragments': True}},
+]
+
+
+def percentile(sorted_values, p):
+    index = int(round(p / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, requests=100, warmup=5):
+    start = clock()
+    schema = synthetic_schema(**scenario.get('schema', {}))
+    schema_time = clock() - start
+    query = synthetic_query(schema, **scenario.get('query', {}))
+    app = graphql_wsgi(schema)
+    path = '/?' + urlencode({'query': query})
+
+    def request():
+        response = Request.blank(path).get_response(app)
+        assert response.status_int == 200, response.text
+        return response
+
+    for i in range(warmup):
+        request()
+
+    latencies = []
+    total_start = clock()
+    for i in range(requests):
+        start = clock()
+        response = request()
+        latencies.append(clock() - start)
+    total = clock() - total_start
+    latencies.sort()
+
+    peak_memory = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        request()
+        current, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'name': scenario['name'],
+        'schema_time': schema_time,
+        'requests': requests,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'throughput': requests / total,
+        'peak_memory': peak_memory,
+        'response_size': len(response.body),
+    }
+
+
+def format_results(results):
+    lines = ['{:<16}{:>10}{:>10}{:>10}{:>12}{:>14}{:>14}'.format(
+        'scenario', 'p50 ms', 'p90 ms', 'p99 ms', 'req/s', 'peak KiB',
+        'response B')]
+    for result in results:
+        peak_memory = result['peak_memory']
+        lines.append(
+            '{:<16}{:>10.2f}{:>10.2f}{:>10.2f}{:>12.1f}{:>14}{:>14}'.format(
+                result['name'],
+                result['p50'] * 1000,
+                result['p90'] * 1000,
+                result['p99'] * 1000,
+                result['throughput'],
+                '-' if peak_memory is None else peak_memory // 1024,
+                result['response_size']))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=100,
+                        help='number of timed requests per scenario')
+    parser.add_argument('--scenario', action='append',
+                        help='only run the named scenario')
+    parser.add_argument('--json', action='store_true',
+                        help='report results as JSON')
+    args = parser.parse_args(argv)
+
+    scenarios = [scenario for scenario in SCENARIOS
+                 if not args.scenario or scenario['name'] in args.scenario]
+    results = [run_scenario(scenario, args.requests)
+               for scenario in scenarios]
+    if args.json:
+        sys.stdout.write(json.dumps(results, indent=2) + '\n')
+    else:
+        sys.stdout.write(format_results(results) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import threading
+from collections import OrderedDict
+from timeit import default_timer as clock
+
+from graphql.type import GraphQLField
+from promise import is_thenable
+
+
+PUBLIC = 'PUBLIC'
+PRIVATE = 'PRIVATE'
+
+
+class CacheControlField(GraphQLField):
+    """A field with a cache hint for :class:`ResolverCache`.
+
+    Results are cached for ``max_age`` seconds. With ``scope`` set to
+    ``PRIVATE`` they are cached separately for each user.
+    """
+    __slots__ = 'max_age', 'scope'
+
+    def __init__(self, type, args=None, resolver=None,
+                 deprecation_reason=None, description=None,
+                 max_age=0, scope=PUBLIC):
+        super(CacheControlField, self).__init__(
+            type, args, resolver, deprecation_reason, description)
+        self.max_age = max_age
+        self.scope = scope
+
+
+def parent_identity(root, info):
+    """Identify the parent object of a field for cache keys.
+
+    Fields on the query root type share the root identity; other objects
+    are identified by an ``id`` attribute or key. Returns ``None`` for
+    objects that cannot be identified, whose fields are not cached.
+    """
+    if info.parent_type is info.schema.get_query_type():
+        return ()
+    if isinstance(root, dict):
+        return root.get('id')
+    return getattr(root, 'id', None)
+
+
+def remote_user(request):
+    return request.remote_user
+
+
+class ResolverCache(object):
+    """Middleware that caches resolver results of hinted fields.
+
+    Only fields declared as :class:`CacheControlField` with a positive
+    ``max_age`` are cached, keyed by schema, parent identity, field and
+    arguments. ``PRIVATE`` entries are additionally keyed by
+    ``user_key(context)``, and are not cached if it returns ``None``.
+    At most ``max_size`` entries are kept; the least recently used
+    entries are evicted first.
+    """
+    def __init__(self, max_size=1000, identify=parent_identity,
+                 user_key=remote_user):
+        self.max_size = max_size
+        self.identify = identify
+        self.user_key = user_key
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def resolve(self, next, root, args, context, info):
+        # meta fields such as __typename are not in the fields of the type
+        field = getattr(info.parent_type, 'fields', {}).get(info.field_name)
+        max_age = getattr(field, 'max_age', 0)
+        if max_age <= 0 or info.operation.operation != 'query':
+            return next(root, args, context, info)
+        parent = self.identify(root, info)
+        if parent is None:
+            return next(root, args, context, info)
+        user = None
+        if field.scope == PRIVATE:
+            user = self.user_key(context)
+            if user is None:
+                return next(root, args, context, info)
+        # the schema itself rather than its id, which may be reused once a
+        # schema evicted from a registry is collected
+        key = (info.schema, user, info.parent_type.name, parent,
+               info.field_name, freeze(args))
+        found, value = self.get(key)
+        if found:
+            return value
+        result = next(root, args, context, info)
+        if is_thenable(result):
+            return result.then(lambda value: self.set(key, value, max_age))
+        return self.set(key, result, max_age)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires <= clock():
+                return False, None
+            self.entries[key] = entry
+            return True, value
+
+    def set(self, key, value, max_age):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = clock() + max_age, value
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item))
+                            for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
@@ -0,0 +1,115 @@
+import six
+from graphql.language import ast
+from graphql.type import GraphQLList, GraphQLNonNull
+
+from .introspection import get_operation
+
+
+LIST_SIZE_ARGUMENTS = ('first', 'last', 'limit')
+
+
+class CostTable(object):
+    """Estimates the cost of operations on a schema.
+
+    Every field costs 1, unless a different cost is given for it in
+    ``field_costs`` by ``'Type.field'``. The selections of list fields
+    are counted once per item; the number of items is taken from a
+    ``first``, ``last`` or ``limit`` argument, or ``default_list_size``
+    if there is none or it is not a non-negative integer.
+    Field information is looked up once per field and kept.
+    """
+    def __init__(self, schema, field_costs=None, default_list_size=10):
+        self.schema = schema
+        self.field_costs = field_costs or {}
+        self.default_list_size = default_list_size
+        self.fields = {}
+
+    def field(self, parent_type, name):
+        key = parent_type.name, name
+        try:
+            return self.fields[key]
+        except KeyError:
+            pass
+        field_def = getattr(parent_type, 'fields', {}).get(name)
+        if field_def is None:
+            # introspection fields and fields on unions
+            info = None
+        else:
+            type = field_def.type
+            is_list = False
+            while isinstance(type, (GraphQLList, GraphQLNonNull)):
+                if isinstance(type, GraphQLList):
+                    is_list = True
+                type = type.of_type
+            cost = self.field_costs.get('{}.{}'.format(*key), 1)
+            info = cost, is_list, type
+        self.fields[key] = info
+        return info
+
+    def operation_cost(self, document, operation_name, variables):
+        operation = get_operation(document, operation_name)
+        if operation is None:
+            return 0
+        if operation.operation == 'mutation':
+            root = self.schema.get_mutation_type()
+        elif operation.operation == 'subscription':
+            root = self.schema.get_subscription_type()
+        else:
+            root = self.schema.get_query_type()
+        fragments = dict(
+            (definition.name.value, definition)
+            for definition in document.definitions
+            if isinstance(definition, ast.FragmentDefinition))
+        return self.selection_cost(root, operation.selection_set, fragments,
+                                   variables or {})
+
+    def selection_cost(self, parent_type, selection_set, fragments,
+                       variables):
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                name = selection.name.value
+                if name == '__typename':
+                    continue
+                info = self.field(parent_type, name)
+                if info is None:
+                    cost += 1
+                    continue
+                field_cost, is_list, type = info
+                cost += field_cost
+                if selection.selection_set is not None:
+                    items = (self.list_size(selection, variables)
+                             if is_list else 1)
+                    cost += items * self.selection_cost(
+                        type, selection.selection_set, fragments, variables)
+            elif isinstance(selection, ast.InlineFragment):
+                type = parent_type
+                if selection.type_condition is not None:
+                    type = self.schema.get_type(
+                        selection.type_condition.name.value)
+                cost += self.selection_cost(
+                    type, selection.selection_set, fragments, variables)
+            else:
+                fragment = fragments[selection.name.value]
+                type = self.schema.get_type(
+                    fragment.type_condition.name.value)
+                cost += self.selection_cost(
+                    type, fragment.selection_set, fragments, variables)
+        return cost
+
+    def list_size(self, field, variables):
+        for argument in field.arguments:
+            if argument.name.value not in LIST_SIZE_ARGUMENTS:
+                continue
+            value = argument.value
+            size = None
+            if isinstance(value, ast.IntValue):
+                size = int(value.value)
+            elif isinstance(value, ast.Variable):
+                size = variables.get(value.name.value)
+            # a negative size would make the cost negative and refill
+            # the bucket of a rate limiter
+            if (isinstance(size, six.integer_types) and
+                    not isinstance(size, bool) and size >= 0):
+                return size
+        return self.default_list_size
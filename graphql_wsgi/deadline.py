@@ -0,0 +1,50 @@
+from timeit import default_timer as clock
+
+from graphql.error import GraphQLError
+
+
+class Deadline(object):
+    """Time budget for the execution of a single GraphQL request.
+
+    The handler exposes it on the request as ``request.deadline``, so
+    resolvers can use ``remaining()`` as the timeout for their own I/O.
+    ``request.deadline`` is always set, to ``None`` for requests without
+    a timeout.
+    """
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires = clock() + timeout
+        self.skipped = 0
+
+    def remaining(self):
+        return max(self.expires - clock(), 0.0)
+
+    def expired(self):
+        return clock() >= self.expires
+
+    def error(self):
+        return GraphQLError(
+            'Execution deadline of {} seconds exceeded; '
+            '{} fields were not resolved.'.format(self.timeout, self.skipped))
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class DeadlineMiddleware(object):
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def resolve(self, next, root, args, context, info):
+        if self.deadline.expired():
+            self.deadline.skipped += 1
+            # returning rather than raising the error makes graphql-core
+            # record it for the field without logging a traceback
+            return DeadlineExceeded(info.field_name)
+        return next(root, args, context, info)
+
+
+def is_deadline_error(error):
+    return isinstance(getattr(error, 'original_error', None),
+                      DeadlineExceeded)
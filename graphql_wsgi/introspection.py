@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from graphql.language import ast
+from webob.response import Response
+
+
+def get_operation(document, operation_name):
+    operations = [definition for definition in document.definitions
+                  if isinstance(definition, ast.OperationDefinition)]
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+    for operation in operations:
+        if operation.name and operation.name.value == operation_name:
+            return operation
+    return None
+
+
+def is_introspection(document, operation_name):
+    """True if the operation only selects introspection fields."""
+    operation = get_operation(document, operation_name)
+    if operation is None or operation.operation != 'query':
+        return False
+    fragments = dict(
+        (definition.name.value, definition)
+        for definition in document.definitions
+        if isinstance(definition, ast.FragmentDefinition))
+
+    def only_introspection(selection_set, seen):
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                if not selection.name.value.startswith('__'):
+                    return False
+            elif isinstance(selection, ast.InlineFragment):
+                if not only_introspection(selection.selection_set, seen):
+                    return False
+            else:
+                name = selection.name.value
+                if name in seen:
+                    continue
+                fragment = fragments.get(name)
+                if fragment is None or not only_introspection(
+                        fragment.selection_set, seen | {name}):
+                    return False
+        return True
+
+    return only_introspection(operation.selection_set, frozenset())
+
+
+class IntrospectionCache(object):
+    """Pre-serialized responses to introspection queries of a schema.
+
+    Both the compact and the pretty serialization are kept, each with an
+    ETag so unchanged responses can be answered with
+    ``304 Not Modified``.
+    """
+    def __init__(self, max_size=20):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def key(self, document_key, operation_name, variables):
+        return (document_key, operation_name,
+                json.dumps(variables or {}, sort_keys=True))
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def set(self, key, compact, pretty):
+        entry = IntrospectionEntry(compact, pretty)
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return entry
+
+    def size(self):
+        with self.lock:
+            return sum(len(entry.compact) + len(entry.pretty)
+                       for entry in self.entries.values())
+
+
+class IntrospectionEntry(object):
+    def __init__(self, compact, pretty):
+        self.compact = compact
+        self.pretty = pretty
+        # a strong ETag must identify the exact bytes, so each variant
+        # gets its own
+        self.compact_etag = hashlib.sha1(compact).hexdigest()
+        self.pretty_etag = hashlib.sha1(pretty).hexdigest()
+
+    def body(self, pretty):
+        return self.pretty if pretty else self.compact
+
+    def response(self, pretty):
+        return Response(content_type='application/json',
+                        body=self.body(pretty),
+                        etag=self.pretty_etag if pretty else self.compact_etag,
+                        conditional_response=True)
@@ -5,14 +5,45 @@ from webob.dec import wsgify
 from webob.response import Response
 
 
-from graphql import graphql
+from graphql.execution import ExecutionResult, execute
+from graphql.language.parser import parse
+from graphql.language.source import Source
+from graphql.validation import validate
 from graphql.error import GraphQLError, format_error as format_graphql_error
+from graphql.execution.middleware import MiddlewareManager
+
+from .aio import BackgroundLoopExecutor, background_loop
+from .deadline import Deadline, DeadlineMiddleware, is_deadline_error
+from .introspection import is_introspection
+from .normalize import document_hash
+from .registry import SchemaState
+from .size import ResponseSize, ResponseSizeMiddleware, ResponseTooLarge
+from .trace import Trace
+
+
+def graphql_wsgi_dynamic(get_options, timeout=None, slow_log=None,
+                         memory_profiler=None, cache_introspection=True,
+                         registry=None, rate_limiter=None,
+                         async_resolvers=False, max_response_size=None):
+    # without a registry only the state of the most recent schema is kept
+    states = [None]
+
+    def get_state(request, schema):
+        if registry is not None:
+            return registry.lookup(request)
+        state = states[0]
+        if state is None or state.schema is not schema:
+            state = states[0] = SchemaState(schema)
+        return state
 
-
-def graphql_wsgi_dynamic(get_options):
     @wsgify
     def handle(request):
-        schema, root_value, pretty, middleware = get_options(request)
+        trace = Trace()
+        options = get_options(request)
+        schema, root_value, pretty = options[:3]
+        middleware = get_option(options, 3, None)
+        request_timeout = get_option(options, 4, timeout)
+        request_max_size = get_option(options, 5, max_response_size)
 
         if request.method != 'GET' and request.method != 'POST':
             return error_response(
@@ -34,28 +65,164 @@ def graphql_wsgi_dynamic(get_options):
         except Error as e:
             return error_response(e, pretty)
 
-        context_value = request
-        result = graphql(schema, query, root_value,
-                context_value,
-                variables,
-                operation_name,
-                middleware=middleware)
-
-        if result.invalid:
-            status = 400
-        else:
-            status = 200
+        deadline = None
+        if request_timeout is not None:
+            deadline = Deadline(request_timeout)
+            middleware = add_middleware(middleware,
+                                        DeadlineMiddleware(deadline))
+        # always set, so resolvers can check for a budget without guards
+        request.deadline = deadline
+
+        response_size = None
+        if request_max_size is not None:
+            response_size = ResponseSize(request_max_size)
+            middleware = add_middleware(
+                middleware, ResponseSizeMiddleware(response_size))
+
+        executor = None
+        if async_resolvers:
+            executor = BackgroundLoopExecutor(background_loop(), deadline)
+            if middleware:
+                middleware = MiddlewareManager(
+                    executor, *add_middleware(middleware),
+                    wrap_in_promise=False)
+
+        state = get_state(request, schema)
+        schema = state.schema
+
+        # profiles are reported through the slow log only
+        if memory_profiler is not None and slow_log is not None:
+            trace.memory = memory_profiler.sample()
 
-        d = {'data': result.data}
-        if result.errors:
-            d['errors'] = [format_error(error) for error in result.errors]
+        try:
+            document, result, document_key = prepare_document(
+                state, query, trace)
+            introspection_key = None
+            if result is None:
+                if rate_limiter is not None:
+                    try:
+                        rate_limiter.charge(request, state, document,
+                                            operation_name, variables)
+                    except Error as e:
+                        return error_response(e, pretty)
+
+                if (cache_introspection and
+                        is_introspection(document, operation_name)):
+                    introspection_key = state.introspection.key(
+                        document_key, operation_name, variables)
+                    entry = state.introspection.get(introspection_key)
+                    if entry is not None:
+                        if (request_max_size is not None and
+                                len(entry.body(pretty)) > request_max_size):
+                            return error_response(
+                                too_large(request_max_size), pretty)
+                        return entry.response(pretty)
+
+                context_value = request
+                result = execute_document(schema, document, root_value,
+                                          context_value,
+                                          variables,
+                                          operation_name,
+                                          middleware,
+                                          executor,
+                                          trace)
+
+            if response_size is not None and response_size.exceeded:
+                return error_response(too_large(request_max_size), pretty)
+
+            if result.invalid:
+                status = 400
+            else:
+                status = 200
+
+            errors = result.errors or []
+            if deadline is not None and deadline.skipped:
+                errors = [error for error in errors
+                          if not is_deadline_error(error)]
+                errors.append(deadline.error())
+
+            with trace.phase('serialize'):
+                d = {'data': result.data}
+                if errors:
+                    d['errors'] = [format_error(error) for error in errors]
+                try:
+                    body = json_dump(d, pretty,
+                                     request_max_size).encode('utf8')
+                except ResponseTooLarge:
+                    return error_response(too_large(request_max_size),
+                                          pretty)
+        finally:
+            if trace.memory is not None:
+                trace.memory.stop()
+
+        if slow_log is not None:
+            slow_log.record(query, document, operation_name, variables,
+                            trace, len(body))
+
+        if introspection_key is not None and not errors:
+            other = json_dump(d, not pretty).encode('utf8')
+            compact, pretty_body = (other, body) if pretty else (body, other)
+            entry = state.introspection.set(introspection_key,
+                                            compact, pretty_body)
+            return entry.response(pretty)
 
         return Response(status=status,
                         content_type='application/json',
-                        body=json_dump(d, pretty).encode('utf8'))
+                        body=body)
     return handle
 
 
+# prepare_document and execute_document follow graphql.graphql, but
+# time each phase separately
+
+
+def prepare_document(state, query, trace):
+    """Parse and validate a query using the document cache of the state.
+
+    Returns the document, or None if it cannot be parsed, an invalid
+    result if there are errors, or None otherwise, and the normalized
+    hash of the document.
+    """
+    entry = state.documents.get(query)
+    if entry is not None:
+        return entry
+    try:
+        with trace.phase('parse'):
+            document = parse(Source(query, 'GraphQL request'))
+            key = document_hash(document)
+    except Exception as e:
+        return None, ExecutionResult(errors=[e], invalid=True), None
+    result = None
+    # validation errors refer to locations in the query text, so only
+    # the validity of documents is shared between equivalent queries
+    if not state.documents.is_valid(key):
+        try:
+            with trace.phase('validate'):
+                validation_errors = validate(state.schema, document)
+        except Exception as e:
+            return document, ExecutionResult(errors=[e], invalid=True), key
+        if validation_errors:
+            result = ExecutionResult(errors=validation_errors, invalid=True)
+        else:
+            state.documents.set_valid(key)
+    entry = document, result, key
+    state.documents.set(query, entry)
+    return entry
+
+
+def execute_document(schema, document, root_value, context_value, variables,
+                     operation_name, middleware, executor, trace):
+    try:
+        with trace.phase('execute'):
+            return execute(schema, document, root_value, context_value,
+                           operation_name=operation_name,
+                           variable_values=variables or {},
+                           executor=executor,
+                           middleware=middleware)
+    except Exception as e:
+        return ExecutionResult(errors=[e], invalid=True)
+
+
 def format_error(error):
     if isinstance(error, GraphQLError):
         return format_graphql_error(error)
@@ -64,20 +231,67 @@ def format_error(error):
         error.__class__.__name__, six.text_type(error))}
 
 
-def graphql_wsgi(schema, root_value=None, pretty=None, middleware=None):
+def graphql_wsgi(schema, root_value=None, pretty=None, middleware=None,
+                 timeout=None, slow_log=None, memory_profiler=None,
+                 cache_introspection=True, rate_limiter=None,
+                 async_resolvers=False, max_response_size=None):
     def get_options(request):
-        return schema, root_value, pretty, middleware
+        return (schema, root_value, pretty, middleware, timeout,
+                max_response_size)
+
+    return graphql_wsgi_dynamic(get_options, slow_log=slow_log,
+                                memory_profiler=memory_profiler,
+                                cache_introspection=cache_introspection,
+                                rate_limiter=rate_limiter,
+                                async_resolvers=async_resolvers)
+
+
+def get_option(options, index, default):
+    if len(options) > index:
+        return options[index]
+    return default
 
-    return graphql_wsgi_dynamic(get_options)
 
+def add_middleware(middleware, *extra):
+    if middleware is None:
+        middleware = []
+    elif isinstance(middleware, MiddlewareManager):
+        middleware = middleware.middlewares
+    return list(middleware) + list(extra)
 
-def json_dump(d, pretty):
+
+def json_dump(d, pretty, max_size=None):
+    if max_size is not None:
+        return json_dump_limited(d, pretty, max_size)
     if not pretty:
         return json.dumps(d, separators=(',', ':'))
     return json.dumps(d, sort_keys=True,
                       indent=2, separators=(',', ': '))
 
 
+def json_dump_limited(d, pretty, max_size):
+    # iterencode is slower than dumps, but stops before building a
+    # response that is too large
+    if not pretty:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(sort_keys=True,
+                                   indent=2, separators=(',', ': '))
+    chunks = []
+    size = 0
+    for chunk in encoder.iterencode(d):
+        size += len(chunk)
+        if size > max_size:
+            raise ResponseTooLarge()
+        chunks.append(chunk)
+    return ''.join(chunks)
+
+
+def too_large(max_size):
+    return Error(
+        'Response exceeds the maximum size of {} bytes.'.format(max_size))
+
+
 def parse_body(request):
     if request.content_type is None:
         return {}
@@ -0,0 +1,95 @@
+import threading
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+class MemoryProfiler(object):
+    """Sampled memory allocation profiling of GraphQL requests.
+
+    One in ``every`` requests is profiled with ``tracemalloc``: for each
+    phase the peak allocated memory (``None`` before Python 3.9) and the
+    ``top`` allocation sites are recorded. Tracing is only active while
+    a sampled request runs, and only one request is profiled at a time.
+    As ``tracemalloc`` is process wide, allocations by concurrent
+    requests in other threads are included in the measurement.
+    """
+    def __init__(self, every=100, top=5, frames=1):
+        if tracemalloc is None:
+            raise RuntimeError('Memory profiling requires tracemalloc.')
+        self.every = every
+        self.top = top
+        self.frames = frames
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def sample(self):
+        """Return a :class:`MemoryProfile` if this request is sampled."""
+        with self.lock:
+            self.count += 1
+            if self.count < self.every:
+                return None
+            self.count = 0
+        # tracemalloc is process wide, so skip the sample if another
+        # request is being profiled already
+        if not MemoryProfile.busy.acquire(False):
+            return None
+        return MemoryProfile(self)
+
+
+class MemoryProfile(object):
+    busy = threading.Lock()
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.phases = {}
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start(profiler.frames)
+
+    def begin(self):
+        # snapshot first, so its own allocations are not in the peak
+        snapshot = take_snapshot()
+        current = None
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            current, peak = tracemalloc.get_traced_memory()
+        return current, snapshot
+
+    def end(self, name, state):
+        start, before = state
+        # without reset_peak (before Python 3.9) the peak can be left
+        # over from an earlier phase, so it is not reported
+        peak = None
+        if start is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            peak -= start
+        after = take_snapshot()
+        stats = after.compare_to(before, 'lineno')[:self.profiler.top]
+        self.phases[name] = {
+            'peak': peak,
+            'top': [{
+                'site': format_site(stat.traceback),
+                'size': stat.size_diff,
+                'count': stat.count_diff,
+            } for stat in stats],
+        }
+
+    def stop(self):
+        if self.started:
+            tracemalloc.stop()
+        self.busy.release()
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+def format_site(traceback):
+    frame = traceback[0]
+    return '{}:{}'.format(frame.filename, frame.lineno)
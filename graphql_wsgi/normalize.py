@@ -0,0 +1,166 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+from graphql.language import ast
+
+
+def normalize(document, hoist_literals=False):
+    """Print a parsed document in a canonical minified form.
+
+    Comments and insignificant whitespace are dropped, definitions are
+    sorted by name, arguments and object fields by name, and anonymous
+    queries use the shorthand form. Returns ``(text, literals)``.
+
+    With ``hoist_literals``, scalar literals in arguments are replaced
+    by the variables ``$_0``, ``$_1``, ... whose values are returned in
+    the ``literals`` dict. As no variable definitions are added for them
+    the text then serves as a key for queries of the same shape, not as
+    an executable document.
+    """
+    printer = Printer(hoist_literals)
+    return printer.print_node(document), printer.literals
+
+
+def document_hash(document, hoist_literals=False):
+    """Stable hash of the canonical form of a parsed document."""
+    text, literals = normalize(document, hoist_literals)
+    return hashlib.sha1(text.encode('utf8')).hexdigest()
+
+
+def definition_key(definition):
+    if isinstance(definition, ast.FragmentDefinition):
+        return 1, definition.name.value
+    return 0, definition.name.value if definition.name else ''
+
+
+def by_name(node):
+    return node.name.value
+
+
+class Printer(object):
+    def __init__(self, hoist_literals):
+        self.hoist_literals = hoist_literals
+        self.hoisting = False
+        self.literals = OrderedDict()
+
+    def print_node(self, node):
+        return getattr(self, 'print_' + node.__class__.__name__)(node)
+
+    def join(self, nodes, separator=''):
+        return separator.join(self.print_node(node) for node in nodes)
+
+    def wrap(self, start, nodes, end, separator=''):
+        if not nodes:
+            return ''
+        return start + self.join(nodes, separator) + end
+
+    def print_Document(self, node):
+        return self.join(sorted(node.definitions, key=definition_key), ' ')
+
+    def print_OperationDefinition(self, node):
+        if (node.operation == 'query' and not node.name and
+                not node.variable_definitions and not node.directives):
+            return self.print_node(node.selection_set)
+        name = ' ' + node.name.value if node.name else ''
+        return (node.operation + name +
+                self.wrap('(', node.variable_definitions, ')', ',') +
+                self.join(node.directives) +
+                self.print_node(node.selection_set))
+
+    def print_VariableDefinition(self, node):
+        default = ''
+        if node.default_value is not None:
+            default = '=' + self.print_node(node.default_value)
+        return (self.print_node(node.variable) + ':' +
+                self.print_node(node.type) + default)
+
+    def print_SelectionSet(self, node):
+        return self.wrap('{', node.selections, '}', ' ')
+
+    def print_Field(self, node):
+        alias = node.alias.value + ':' if node.alias else ''
+        return (alias + node.name.value +
+                self.print_arguments(node.arguments) +
+                self.join(node.directives) +
+                (self.print_node(node.selection_set)
+                 if node.selection_set else ''))
+
+    def print_arguments(self, arguments):
+        self.hoisting = self.hoist_literals
+        try:
+            return self.wrap('(', sorted(arguments, key=by_name), ')', ',')
+        finally:
+            self.hoisting = False
+
+    def print_Argument(self, node):
+        return node.name.value + ':' + self.print_node(node.value)
+
+    def print_FragmentSpread(self, node):
+        return '...' + node.name.value + self.join(node.directives)
+
+    def print_InlineFragment(self, node):
+        type_condition = ''
+        if node.type_condition:
+            type_condition = ' on ' + node.type_condition.name.value
+        return ('...' + type_condition +
+                self.join(node.directives) +
+                self.print_node(node.selection_set))
+
+    def print_FragmentDefinition(self, node):
+        return ('fragment ' + node.name.value +
+                ' on ' + node.type_condition.name.value +
+                self.join(node.directives) +
+                self.print_node(node.selection_set))
+
+    def print_Directive(self, node):
+        return '@' + node.name.value + self.print_arguments(node.arguments)
+
+    def print_Variable(self, node):
+        return '$' + node.name.value
+
+    def hoist(self, value):
+        name = '_{}'.format(len(self.literals))
+        self.literals[name] = value
+        return '$' + name
+
+    def print_IntValue(self, node):
+        if self.hoisting:
+            return self.hoist(int(node.value))
+        return node.value
+
+    def print_FloatValue(self, node):
+        if self.hoisting:
+            return self.hoist(float(node.value))
+        return node.value
+
+    def print_StringValue(self, node):
+        if self.hoisting:
+            return self.hoist(node.value)
+        return json.dumps(node.value)
+
+    def print_BooleanValue(self, node):
+        if self.hoisting:
+            return self.hoist(node.value)
+        return 'true' if node.value else 'false'
+
+    def print_EnumValue(self, node):
+        return node.value
+
+    def print_ListValue(self, node):
+        return '[' + self.join(node.values, ',') + ']'
+
+    def print_ObjectValue(self, node):
+        return '{' + self.join(sorted(node.fields, key=by_name), ',') + '}'
+
+    def print_ObjectField(self, node):
+        return node.name.value + ':' + self.print_node(node.value)
+
+    def print_NamedType(self, node):
+        return node.name.value
+
+    def print_ListType(self, node):
+        return '[' + self.print_node(node.type) + ']'
+
+    def print_NonNullType(self, node):
+        return self.print_node(node.type) + '!'
@@ -0,0 +1,151 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from .cost import CostTable
+from .main import Error
+
+
+def client_address(request):
+    """The address the request came from, REMOTE_ADDR.
+
+    Headers such as X-Forwarded-For are ignored as clients can set them
+    to anything. Behind a proxy, pass a ``key`` to :class:`RateLimiter`
+    that takes the address from the header set by the trusted proxy.
+    """
+    return request.remote_addr
+
+
+class TokenBucketStore(object):
+    """Token buckets kept in the memory of this process.
+
+    Buckets that have refilled to capacity are the same as new ones, so
+    they are dropped once per refill period to keep the number of
+    buckets bounded by the clients seen recently.
+    """
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.pruned = time.time()
+
+    def consume(self, key, amount, rate, capacity):
+        """Take ``amount`` tokens from the bucket for ``key``.
+
+        Returns 0 if there were enough tokens, otherwise the number of
+        seconds until there will be, in which case nothing is taken.
+        """
+        now = time.time()
+        with self.lock:
+            if now - self.pruned >= float(capacity) / rate:
+                self.buckets = dict(
+                    (other, bucket) for other, bucket in self.buckets.items()
+                    if not full(bucket[0], bucket[1], now, rate, capacity))
+                self.pruned = now
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens, wait = take(tokens, updated, now, amount, rate, capacity)
+            self.buckets[key] = tokens, now
+        return wait
+
+
+class SQLiteTokenBucketStore(object):
+    """Token buckets in an SQLite database shared by local processes.
+
+    This lets all worker processes on a host charge the same buckets.
+    Like :class:`TokenBucketStore`, buckets that have refilled to
+    capacity are deleted once per refill period.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.pruned = time.time()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10,
+                                         isolation_level=None)
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def consume(self, key, amount, rate, capacity):
+        connection = self.connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if now - self.pruned >= float(capacity) / rate:
+                connection.execute(
+                    'DELETE FROM buckets '
+                    'WHERE tokens + (? - updated) * ? >= ?',
+                    (now, rate, capacity))
+                self.pruned = now
+            row = connection.execute(
+                'SELECT tokens, updated FROM buckets WHERE key = ?',
+                (key,)).fetchone()
+            tokens, updated = row if row is not None else (capacity, now)
+            tokens, wait = take(tokens, updated, now, amount, rate, capacity)
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated) '
+                'VALUES (?, ?, ?)', (key, tokens, now))
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return wait
+
+
+def full(tokens, updated, now, rate, capacity):
+    return tokens + max(now - updated, 0) * rate >= capacity
+
+
+def take(tokens, updated, now, amount, rate, capacity):
+    tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+    if tokens >= amount:
+        return tokens - amount, 0
+    return tokens, (amount - tokens) / rate
+
+
+class RateLimiter(object):
+    """Charges clients the cost of their operations against token buckets.
+
+    Each client, identified by ``key(request)``, has a bucket holding up
+    to ``capacity`` tokens that refills at ``rate`` tokens per second.
+    Operation costs are computed with a :class:`graphql_wsgi.cost.CostTable`
+    per schema. Requests for which ``key`` returns ``None`` are not
+    limited.
+    """
+    def __init__(self, rate, capacity, key=client_address, store=None,
+                 field_costs=None, default_list_size=10):
+        self.rate = rate
+        self.capacity = capacity
+        self.key = key
+        self.store = store if store is not None else TokenBucketStore()
+        self.field_costs = field_costs
+        self.default_list_size = default_list_size
+
+    def cost_table(self, state):
+        table = state.costs.get(self)
+        if table is None:
+            table = state.costs[self] = CostTable(
+                state.schema, self.field_costs, self.default_list_size)
+        return table
+
+    def charge(self, request, state, document, operation_name, variables):
+        """Charge the cost of an operation, raising Error if over limit."""
+        key = self.key(request)
+        if key is None:
+            return
+        cost = self.cost_table(state).operation_cost(
+            document, operation_name, variables)
+        if cost > self.capacity:
+            raise Error('Query cost of {} exceeds the maximum of {}.'.format(
+                cost, self.capacity))
+        wait = self.store.consume(key, cost, self.rate, self.capacity)
+        if wait > 0:
+            raise Error('Rate limit exceeded.', status=429,
+                        headers={'Retry-After': str(int(math.ceil(wait)))})
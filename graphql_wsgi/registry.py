@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from timeit import default_timer as clock
+
+from graphql.type import GraphQLObjectType, GraphQLInterfaceType
+
+from .introspection import IntrospectionCache
+
+
+# rough per-object sizes in bytes used to estimate tenant memory use
+TYPE_SIZE = 2048
+FIELD_SIZE = 512
+DOCUMENT_OVERHEAD = 10
+HASH_SIZE = 100
+
+
+class DocumentCache(object):
+    """LRU caches of parsed and validated documents.
+
+    Entries are looked up by query text first, which avoids parsing
+    repeated queries. Queries that only differ in formatting or
+    fragment order are recognized by their normalized hash after
+    parsing, so they are validated only once.
+    """
+    def __init__(self, max_size=100):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.valid = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, query):
+        with self.lock:
+            entry = self.entries.pop(query, None)
+            if entry is not None:
+                self.entries[query] = entry
+            return entry
+
+    def set(self, query, entry):
+        with self.lock:
+            self.entries[query] = entry
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def is_valid(self, key):
+        with self.lock:
+            if self.valid.pop(key, None) is None:
+                return False
+            self.valid[key] = True
+            return True
+
+    def set_valid(self, key):
+        with self.lock:
+            self.valid[key] = True
+            while len(self.valid) > self.max_size:
+                self.valid.popitem(last=False)
+
+    def size(self):
+        with self.lock:
+            return (sum(len(query) * DOCUMENT_OVERHEAD
+                        for query in self.entries) +
+                    len(self.valid) * HASH_SIZE)
+
+
+class SchemaState(object):
+    """A schema together with the caches that belong to it."""
+    def __init__(self, schema, document_cache_size=100):
+        self.schema = schema
+        self.documents = DocumentCache(document_cache_size)
+        self.introspection = IntrospectionCache()
+        # cost tables by rate limiter
+        self.costs = {}
+        # estimated on first use, as only the memory budget of a
+        # registry needs it and walking a large schema is slow
+        self.schema_size = None
+        self.last_used = clock()
+
+    def size(self):
+        if self.schema_size is None:
+            self.schema_size = estimate_schema_size(self.schema)
+        return (self.schema_size + self.documents.size() +
+                self.introspection.size())
+
+
+def estimate_schema_size(schema):
+    size = 0
+    for type in schema.get_type_map().values():
+        size += TYPE_SIZE
+        if isinstance(type, (GraphQLObjectType, GraphQLInterfaceType)):
+            size += FIELD_SIZE * len(type.fields)
+    return size
+
+
+class SchemaRegistry(object):
+    """Schemas for multiple tenants, built on first use.
+
+    ``tenant_key(request)`` determines the tenant of a request, and
+    ``build_schema(tenant)`` builds its schema. Each tenant gets a
+    :class:`SchemaState` with its own caches. Whenever a tenant is built,
+    tenants without requests for ``max_idle`` seconds are dropped, and
+    while the estimated memory use of all tenants exceeds
+    ``memory_budget`` bytes the least recently used tenants are dropped.
+    """
+    def __init__(self, build_schema, tenant_key, memory_budget=None,
+                 max_idle=None, document_cache_size=100):
+        self.build_schema = build_schema
+        self.tenant_key = tenant_key
+        self.memory_budget = memory_budget
+        self.max_idle = max_idle
+        self.document_cache_size = document_cache_size
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+        self.build_locks = {}
+
+    def lookup(self, request):
+        tenant = self.tenant_key(request)
+        with self.lock:
+            state = self.states.pop(tenant, None)
+            if state is not None:
+                self.states[tenant] = state
+                state.last_used = clock()
+                return state
+            build_lock = self.build_locks.setdefault(tenant,
+                                                     threading.Lock())
+        # build outside of the registry lock so other tenants are
+        # served meanwhile, but only once per tenant
+        with build_lock:
+            with self.lock:
+                state = self.states.get(tenant)
+            if state is None:
+                state = SchemaState(self.build_schema(tenant),
+                                    self.document_cache_size)
+            with self.lock:
+                self.states[tenant] = state
+                self.build_locks.pop(tenant, None)
+                self.evict(tenant)
+        return state
+
+    def evict(self, keep):
+        if self.max_idle is not None:
+            expired = clock() - self.max_idle
+            for tenant, state in list(self.states.items()):
+                if tenant != keep and state.last_used < expired:
+                    del self.states[tenant]
+        if self.memory_budget is not None:
+            sizes = OrderedDict((tenant, state.size())
+                                for tenant, state in self.states.items())
+            total = sum(sizes.values())
+            for tenant, size in sizes.items():
+                if total <= self.memory_budget:
+                    break
+                if tenant != keep:
+                    del self.states[tenant]
+                    total -= size
+
+    def tenants(self):
+        with self.lock:
+            return list(self.states)
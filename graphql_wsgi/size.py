@@ -0,0 +1,65 @@
+import six
+from promise import is_thenable
+
+
+class ResponseSize(object):
+    """Budget for the estimated size of a response in bytes."""
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.exceeded = False
+
+    def add(self, size):
+        self.size += size
+        if self.size > self.max_size:
+            self.exceeded = True
+        return not self.exceeded
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class ResponseSizeMiddleware(object):
+    """Estimates the size of the response while it is being resolved.
+
+    Once the budget is exceeded no further fields are resolved. Lists
+    are counted by their length before their items are completed, so
+    the completion of an oversized list is skipped altogether.
+    """
+    def __init__(self, budget):
+        self.budget = budget
+
+    def resolve(self, next, root, args, context, info):
+        if self.budget.exceeded:
+            return ResponseTooLarge()
+        field_ast = info.field_asts[0]
+        key = field_ast.alias or field_ast.name
+        # "key":, plus a separator
+        if not self.budget.add(len(key.value) + 4):
+            return ResponseTooLarge()
+
+        def count(value):
+            if not self.budget.add(value_size(value)):
+                return ResponseTooLarge()
+            return value
+
+        result = next(root, args, context, info)
+        if is_thenable(result):
+            return result.then(count)
+        return count(result)
+
+
+def value_size(value):
+    if value is None:
+        return 4
+    if isinstance(value, bool):
+        return 5
+    if isinstance(value, six.string_types):
+        return len(value) + 2
+    if isinstance(value, six.integer_types + (float,)):
+        return len(repr(value))
+    if isinstance(value, (list, tuple)):
+        # brackets and a separator per item
+        return len(value) + 2
+    return 2
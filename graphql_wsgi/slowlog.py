@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+from collections import deque
+
+import six
+from webob.dec import wsgify
+from webob.response import Response
+
+from .main import json_dump
+from .normalize import document_hash
+
+
+class SlowLog(object):
+    """Bounded in-memory record of slow GraphQL operations.
+
+    Operations taking longer than ``threshold`` seconds are kept; once
+    ``size`` entries are recorded the oldest ones are dropped. Requests
+    below the threshold cost no more than a single comparison. Requests
+    sampled by a :class:`graphql_wsgi.memory.MemoryProfiler` are always
+    recorded, with their memory profile under ``memory``.
+    """
+    def __init__(self, threshold=1.0, size=100):
+        self.threshold = threshold
+        self.entries = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, query, document, operation_name, variables, trace,
+               response_size):
+        duration = trace.duration()
+        memory = trace.memory
+        if duration < self.threshold and memory is None:
+            return
+        entry = {
+            'time': time.time(),
+            'query_hash': query_hash(query, document),
+            'operation_name': operation_name,
+            'variables': variable_shape(variables or {}),
+            'duration': duration,
+            'phases': dict(trace.phases),
+            'response_size': response_size,
+        }
+        if memory is not None:
+            entry['memory'] = memory.phases
+        with self.lock:
+            self.entries.append(entry)
+
+    def slowest(self, n=10):
+        with self.lock:
+            entries = list(self.entries)
+        entries.sort(key=lambda entry: entry['duration'], reverse=True)
+        return entries[:n]
+
+    def most_frequent(self, n=10):
+        with self.lock:
+            entries = list(self.entries)
+        operations = {}
+        for entry in entries:
+            key = entry['query_hash'], entry['operation_name']
+            operation = operations.get(key)
+            if operation is None:
+                operation = operations[key] = {
+                    'query_hash': entry['query_hash'],
+                    'operation_name': entry['operation_name'],
+                    'count': 0,
+                    'total_duration': 0.0,
+                    'max_duration': 0.0,
+                }
+            operation['count'] += 1
+            operation['total_duration'] += entry['duration']
+            operation['max_duration'] = max(operation['max_duration'],
+                                            entry['duration'])
+        result = sorted(operations.values(),
+                        key=lambda operation: operation['count'],
+                        reverse=True)
+        return result[:n]
+
+
+def slow_log_wsgi(slow_log, top=10, pretty=None):
+    """WSGI app that dumps the contents of a :class:`SlowLog` as JSON.
+
+    The number of entries reported can be changed with a ``top`` query
+    parameter.
+    """
+    @wsgify
+    def handle(request):
+        try:
+            n = int(request.GET.get('top', top))
+        except ValueError:
+            n = top
+        d = {
+            'slowest': slow_log.slowest(n),
+            'most_frequent': slow_log.most_frequent(n),
+        }
+        return Response(content_type='application/json',
+                        body=json_dump(d, pretty).encode('utf8'))
+    return handle
+
+
+def query_hash(query, document):
+    """Label for operations of the same shape.
+
+    Queries that could not be parsed are labelled by their text.
+    """
+    if document is not None:
+        return document_hash(document, hoist_literals=True)
+    return hashlib.sha1(query.encode('utf8')).hexdigest()
+
+
+def variable_shape(value):
+    if isinstance(value, dict):
+        return dict((key, variable_shape(item))
+                    for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [variable_shape(value[0])] if value else []
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, six.string_types):
+        return 'string'
+    if isinstance(value, six.integer_types + (float,)):
+        return 'number'
+    return type(value).__name__
@@ -0,0 +1,97 @@
+"""Synthetic schemas and queries for load testing.
+
+The schema consists of ``types`` object types ``Type0`` ... ``TypeN``,
+each with ``fields`` string fields ``field0`` ... and ``links`` pairs of
+object fields ``link0``/``list0`` ... pointing at other types. The links
+form a tree, with links past the last type pointing back to ``Type0``;
+this keeps graphql-core from recursing through all types when building
+the schema. List fields return ``list_size`` items. The query root has a field
+``type0`` ... for every type.
+"""
+from collections import OrderedDict
+
+from graphql.type import (
+    GraphQLField,
+    GraphQLList,
+    GraphQLObjectType,
+    GraphQLSchema,
+    GraphQLString,
+)
+
+
+def synthetic_schema(types=10, fields=5, links=2, list_size=3):
+    object_types = []
+    branching = max(links, 2)
+
+    def scalar_resolver(root, args, context, info):
+        return '{}.{}'.format(root, info.field_name)
+
+    def link_resolver(root, args, context, info):
+        return root + 1
+
+    def list_resolver(root, args, context, info):
+        return [root * list_size + i for i in range(list_size)]
+
+    def root_resolver(root, args, context, info):
+        return 0
+
+    def object_type(index):
+        def get_fields():
+            result = OrderedDict()
+            for i in range(fields):
+                result['field{}'.format(i)] = GraphQLField(
+                    GraphQLString, resolver=scalar_resolver)
+            for i in range(links):
+                target = index * branching + i + 1
+                target = object_types[target if target < types else 0]
+                result['link{}'.format(i)] = GraphQLField(
+                    target, resolver=link_resolver)
+                result['list{}'.format(i)] = GraphQLField(
+                    GraphQLList(target), resolver=list_resolver)
+            return result
+        return GraphQLObjectType('Type{}'.format(index), fields=get_fields)
+
+    object_types.extend(object_type(i) for i in range(types))
+
+    def get_root_fields():
+        return OrderedDict(
+            ('type{}'.format(i), GraphQLField(t, resolver=root_resolver))
+            for i, t in enumerate(object_types))
+
+    return GraphQLSchema(
+        query=GraphQLObjectType('Query', fields=get_root_fields),
+        types=object_types)
+
+
+def synthetic_query(schema, depth=2, fields=2, links=1, lists=True,
+                    fragments=False):
+    """Query selecting ``fields`` scalar fields and ``links`` object
+    fields per level, ``depth`` levels deep starting at ``type0``.
+
+    With ``lists`` the list fields are followed instead of the single
+    object links, so the size of the result grows exponentially with
+    depth. With ``fragments`` the scalar fields of each type are
+    selected through a named fragment.
+    """
+    used_fragments = OrderedDict()
+
+    def select(type, level):
+        scalars = ' '.join('field{}'.format(i) for i in range(fields))
+        if fragments:
+            name = '{}Fields'.format(type.name)
+            used_fragments[name] = 'fragment {} on {} {{ {} }}'.format(
+                name, type.name, scalars)
+            scalars = '...' + name
+        selections = [scalars]
+        if level < depth:
+            for i in range(links):
+                field_name = '{}{}'.format('list' if lists else 'link', i)
+                field_type = type.fields[field_name].type
+                if lists:
+                    field_type = field_type.of_type
+                selections.append('{} {}'.format(
+                    field_name, select(field_type, level + 1)))
+        return '{ ' + ' '.join(selections) + ' }'
+
+    query = '{ type0 ' + select(schema.get_type('Type0'), 1) + ' }'
+    return '\n'.join([query] + list(used_fragments.values()))
@@ -0,0 +1,31 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer as clock
+
+
+class Trace(object):
+    """Wall clock timings of the phases of a single GraphQL request.
+
+    If ``memory`` is set to a :class:`graphql_wsgi.memory.MemoryProfile`,
+    memory allocation is profiled for each phase as well.
+    """
+    def __init__(self):
+        self.start = clock()
+        self.phases = OrderedDict()
+        self.memory = None
+
+    @contextmanager
+    def phase(self, name):
+        memory = self.memory
+        if memory is not None:
+            memory_state = memory.begin()
+        start = clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = clock() - start
+            if memory is not None:
+                memory.end(name, memory_state)
+
+    def duration(self):
+        return clock() - self.start
@@ -0,0 +1,47 @@
+from graphql.language.parser import parse
+from graphql_wsgi.cost import CostTable
+from graphql_wsgi.synthetic import synthetic_schema
+
+
+schema = synthetic_schema(types=5, fields=2, links=1)
+
+
+def cost(query, variables=None, **kw):
+    return CostTable(schema, **kw).operation_cost(parse(query), None,
+                                                  variables)
+
+
+def test_field_cost():
+    assert cost('{ type0 { field0 field1 __typename } }') == 3
+
+
+def test_list_cost():
+    assert cost('{ type0 { field0 list0 { field0 field1 } } }') == 23
+    assert cost('{ type0 { list0 { field0 } } }', default_list_size=3) == 5
+
+
+def test_list_size_arguments():
+    assert cost('{ type0 { list0(first: 2) { field0 } } }') == 4
+    assert cost('query q($n: Int) { type0 { list0(limit: $n) { field0 } } }',
+                {'n': 5}) == 7
+
+
+def test_fragments_cost():
+    assert cost('''
+      { type0 { ...fields ... on Type0 { field1 } } }
+      fragment fields on Type0 { field0 link0 { field0 } }
+    ''') == 5
+
+
+def test_field_costs():
+    assert cost('{ type0 { field0 field1 } }',
+                field_costs={'Type0.field1': 10}) == 12
+
+
+def test_invalid_list_sizes_use_default():
+    assert cost('{ type0 { list0(first: -1000) { field0 } } }') == 12
+    assert cost('query q($n: Int) { type0 { list0(first: $n) { field0 } } }',
+                {'n': -5}) == 12
+    assert cost('query q($n: Int) { type0 { list0(first: $n) { field0 } } }',
+                {'n': True}) == 12
+    assert cost('{ type0 { list0(first: 0) { field0 } } }') == 2
@@ -1,16 +1,40 @@
 import pytest
 import json
+import time
 from webtest import TestApp as Client
-from graphql_wsgi import graphql_wsgi, graphql_wsgi_dynamic
+from graphql_wsgi import (
+    graphql_wsgi, graphql_wsgi_dynamic, CacheControlField, MemoryProfiler,
+    PRIVATE, RateLimiter, ResolverCache, SchemaRegistry, SlowLog,
+    SQLiteTokenBucketStore, TokenBucketStore, slow_log_wsgi)
 
 from graphql.type import (
     GraphQLObjectType,
     GraphQLField,
     GraphQLArgument,
+    GraphQLBoolean,
     GraphQLNonNull,
     GraphQLSchema,
     GraphQLString,
 )
+from graphql.utils.introspection_query import introspection_query
+from graphql_wsgi.main import json_dump
+from graphql_wsgi.size import ResponseTooLarge
+from graphql_wsgi.synthetic import synthetic_schema, synthetic_query
+
+try:
+    import asyncio
+except ImportError:  # Python 2
+    asyncio = None
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+requires_asyncio = pytest.mark.skipif(asyncio is None,
+                                      reason='requires asyncio')
+requires_tracemalloc = pytest.mark.skipif(tracemalloc is None,
+                                          reason='requires tracemalloc')
 
 
 def raises(*_):
@@ -517,3 +541,702 @@ def test_POST_functionality_variables_in_json_POST_body_not_encoded():
             'test': 'Hello Dolly'
         }
     }
+
+
+def slow_resolver(root, args, *_):
+    time.sleep(0.05)
+    return 'Slow'
+
+
+def remaining_resolver(root, args, context, info):
+    if context.deadline is None:
+        return None
+    return context.deadline.remaining() > 0
+
+
+DeadlineSchema = GraphQLSchema(
+    query=GraphQLObjectType(
+        'Root',
+        fields=lambda: {
+            'slow': GraphQLField(
+                GraphQLString,
+                resolver=slow_resolver
+            ),
+            'test': GraphQLField(
+                GraphQLString,
+                args={
+                    'who': GraphQLArgument(
+                        type=GraphQLString
+                    )
+                },
+                resolver=resolver
+            ),
+            'remaining': GraphQLField(
+                GraphQLBoolean,
+                resolver=remaining_resolver
+            ),
+        }
+    )
+)
+
+
+def test_deadline_returns_partial_results():
+    wsgi = graphql_wsgi(DeadlineSchema, timeout=0.01)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{slow, a: test, b: test}'})
+
+    assert response.json == {
+        'data': {
+            'slow': 'Slow',
+            'a': None,
+            'b': None,
+        },
+        'errors': [{
+            'message': ('Execution deadline of 0.01 seconds exceeded; '
+                        '2 fields were not resolved.')
+        }]
+    }
+
+
+def test_deadline_not_exceeded():
+    wsgi = graphql_wsgi(DeadlineSchema, timeout=10)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{slow, test, remaining}'})
+
+    assert response.json == {
+        'data': {
+            'slow': 'Slow',
+            'test': 'Hello World',
+            'remaining': True,
+        }
+    }
+
+
+def test_deadline_configured_by_request():
+    def options_from_request(request):
+        return DeadlineSchema, None, False, None, float(request.GET['timeout'])
+
+    wsgi = graphql_wsgi_dynamic(options_from_request, timeout=0.01)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{slow, test}', 'timeout': '10'})
+
+    assert response.json == {
+        'data': {
+            'slow': 'Slow',
+            'test': 'Hello World',
+        }
+    }
+
+
+def test_deadline_none_without_timeout():
+    def options_from_request(request):
+        return DeadlineSchema, None, False, None, None
+
+    for wsgi in [graphql_wsgi(DeadlineSchema),
+                 graphql_wsgi_dynamic(options_from_request, timeout=10)]:
+        c = Client(wsgi)
+        response = c.get('/', {'query': '{remaining}'})
+
+        assert response.json == {'data': {'remaining': None}}
+
+
+def test_slow_log_records_slow_operations():
+    slow_log = SlowLog(threshold=0.01)
+    wsgi = graphql_wsgi(DeadlineSchema, slow_log=slow_log)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}'})
+    c.get('/', {
+        'query': 'query slowWho($who: String){ slow, test(who: $who) }',
+        'variables': json.dumps({'who': 'Dolly'})
+    })
+
+    entries = slow_log.slowest()
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry['operation_name'] is None
+    assert entry['variables'] == {'who': 'string'}
+    assert entry['duration'] >= 0.05
+    assert sorted(entry['phases']) == [
+        'execute', 'parse', 'serialize', 'validate']
+    assert entry['response_size'] == len(
+        b'{"data":{"slow":"Slow","test":"Hello Dolly"}}')
+
+
+def test_slow_log_wsgi():
+    slow_log = SlowLog(threshold=0)
+    wsgi = graphql_wsgi(TestSchema, slow_log=slow_log)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}'})
+    c.get('/', {'query': '{test}'})
+    c.get('/', {'query': 'query hello { test }'})
+
+    c = Client(slow_log_wsgi(slow_log, top=1))
+    response = c.get('/')
+
+    assert len(response.json['slowest']) == 1
+    assert len(response.json['most_frequent']) == 1
+    most_frequent = response.json['most_frequent'][0]
+    assert most_frequent['count'] == 2
+    assert most_frequent['operation_name'] is None
+
+    response = c.get('/', {'top': '5'})
+    assert len(response.json['slowest']) == 3
+    assert len(response.json['most_frequent']) == 2
+
+
+@requires_tracemalloc
+def test_memory_profiler_samples_requests():
+    slow_log = SlowLog(threshold=10)
+    memory_profiler = MemoryProfiler(every=2)
+    wsgi = graphql_wsgi_dynamic(lambda request: (TestSchema, None, False),
+                                slow_log=slow_log,
+                                memory_profiler=memory_profiler)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}'})
+    assert slow_log.slowest() == []
+
+    c.get('/', {'query': '{test(who: "Dolly")}'})
+    entries = slow_log.slowest()
+    assert len(entries) == 1
+    memory = entries[0]['memory']
+    assert sorted(memory) == ['execute', 'parse', 'serialize', 'validate']
+    # the peak of a phase cannot be measured before Python 3.9
+    peak = memory['execute']['peak']
+    assert peak is None or peak >= 0
+    for site in memory['execute']['top']:
+        assert sorted(site) == ['count', 'site', 'size']
+
+
+def test_resolver_cache_caches_hinted_fields():
+    calls = []
+
+    def counting_resolver(root, args, context, info):
+        calls.append(info.field_name)
+        return 'Hello ' + args.get('who', 'World')
+
+    schema = GraphQLSchema(
+        query=GraphQLObjectType(
+            'Root',
+            fields=lambda: {
+                'public': CacheControlField(
+                    GraphQLString,
+                    args={
+                        'who': GraphQLArgument(
+                            type=GraphQLString
+                        )
+                    },
+                    resolver=counting_resolver,
+                    max_age=60
+                ),
+                'private': CacheControlField(
+                    GraphQLString,
+                    resolver=counting_resolver,
+                    max_age=60,
+                    scope=PRIVATE
+                ),
+                'uncached': GraphQLField(
+                    GraphQLString,
+                    resolver=counting_resolver
+                ),
+            }
+        )
+    )
+    wsgi = graphql_wsgi(schema, middleware=[ResolverCache()])
+
+    c = Client(wsgi)
+    query = '{public, dolly: public(who: "Dolly"), private, uncached}'
+    response = c.get('/', {'query': query},
+                     extra_environ={'REMOTE_USER': 'alice'})
+    assert response.json == {
+        'data': {
+            'public': 'Hello World',
+            'dolly': 'Hello Dolly',
+            'private': 'Hello World',
+            'uncached': 'Hello World',
+        }
+    }
+    assert sorted(calls) == ['private', 'public', 'public', 'uncached']
+
+    del calls[:]
+    c.get('/', {'query': query}, extra_environ={'REMOTE_USER': 'alice'})
+    assert calls == ['uncached']
+
+    del calls[:]
+    c.get('/', {'query': query}, extra_environ={'REMOTE_USER': 'bob'})
+    assert sorted(calls) == ['private', 'uncached']
+
+    del calls[:]
+    c.get('/', {'query': query})
+    assert sorted(calls) == ['private', 'uncached']
+
+
+def test_resolver_cache_evicts_least_recently_used():
+    cache = ResolverCache(max_size=2)
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    assert cache.get('a') == (True, 1)
+    cache.set('c', 3, 60)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+    cache.set('d', 4, -1)
+    assert cache.get('d') == (False, None)
+
+
+def test_resolver_cache_passes_meta_fields():
+    schema = GraphQLSchema(
+        query=GraphQLObjectType(
+            'Root',
+            fields=lambda: {
+                'cfg': CacheControlField(
+                    GraphQLString,
+                    resolver=lambda *_: 'Config',
+                    max_age=60
+                ),
+            }
+        )
+    )
+    wsgi = graphql_wsgi(schema, middleware=[ResolverCache()])
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{ cfg, __typename }'})
+    assert response.json == {
+        'data': {'cfg': 'Config', '__typename': 'Root'}}
+
+    response = c.get('/', {'query': introspection_query})
+    assert 'errors' not in response.json
+    assert response.json['data']['__schema']['queryType'] == {
+        'name': 'Root'}
+
+
+def test_resolver_cache_keyed_by_schema():
+    def tenant_schema(tenant):
+        return GraphQLSchema(
+            query=GraphQLObjectType(
+                'Root',
+                fields=lambda: {
+                    'cfg': CacheControlField(
+                        GraphQLString,
+                        resolver=lambda *_: 'tenant-' + tenant,
+                        max_age=60
+                    ),
+                }
+            )
+        )
+
+    registry = SchemaRegistry(tenant_schema,
+                              lambda request: request.GET['tenant'])
+    cache = ResolverCache()
+    wsgi = graphql_wsgi_dynamic(lambda request: (None, None, False, [cache]),
+                                registry=registry)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{cfg}', 'tenant': 'a'})
+    assert response.json == {'data': {'cfg': 'tenant-a'}}
+    response = c.get('/', {'query': '{cfg}', 'tenant': 'b'})
+    assert response.json == {'data': {'cfg': 'tenant-b'}}
+
+
+def test_introspection_served_from_cache():
+    wsgi = graphql_wsgi(TestSchema)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': introspection_query})
+    etag = response.headers['ETag']
+    assert response.json['data']['__schema']['queryType'] == {'name': 'Root'}
+
+    response = c.get('/', {'query': introspection_query},
+                     headers={'If-None-Match': etag}, status=304)
+    assert response.body == b''
+
+    response = c.get('/', {'query': '{ __typename }'})
+    assert response.json == {'data': {'__typename': 'Root'}}
+    assert response.headers['ETag'] != etag
+
+
+def test_introspection_cache_pretty_and_invalidation():
+    def options_from_request(request):
+        schema = TestSchema if request.GET['schema'] == 'test' else (
+            DeadlineSchema)
+        return schema, None, request.GET.get('pretty') == '1'
+
+    wsgi = graphql_wsgi_dynamic(options_from_request)
+
+    c = Client(wsgi)
+    query = '{ __schema { queryType { fields { name } } } }'
+    compact = c.get('/', {'query': query, 'schema': 'test'})
+    pretty = c.get('/', {'query': query, 'schema': 'test', 'pretty': '1'})
+    assert compact.json == pretty.json
+    assert pretty.body == json.dumps(
+        compact.json, sort_keys=True, indent=2,
+        separators=(',', ': ')).encode('utf8')
+    assert compact.headers['ETag'] != pretty.headers['ETag']
+    c.get('/', {'query': query, 'schema': 'test', 'pretty': '1'},
+          headers={'If-None-Match': pretty.headers['ETag']}, status=304)
+    c.get('/', {'query': query, 'schema': 'test'},
+          headers={'If-None-Match': pretty.headers['ETag']}, status=200)
+
+    other = c.get('/', {'query': query, 'schema': 'deadline'})
+    assert other.headers['ETag'] != compact.headers['ETag']
+    assert 'remaining' in other.text
+
+
+def test_introspection_not_cached_if_disabled():
+    wsgi = graphql_wsgi(TestSchema, cache_introspection=False)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{ __typename }'})
+    assert response.json == {'data': {'__typename': 'Root'}}
+    assert 'ETag' not in response.headers
+
+
+def test_introspection_mixed_with_fields_not_cached():
+    wsgi = graphql_wsgi(TestSchema)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{ __typename, test }'})
+    assert response.json == {
+        'data': {'__typename': 'Root', 'test': 'Hello World'}}
+    assert 'ETag' not in response.headers
+
+
+def test_registry_serves_tenant_schemas():
+    built = []
+
+    def build_schema(tenant):
+        built.append(tenant)
+        return TestSchema if tenant == 'test' else DeadlineSchema
+
+    registry = SchemaRegistry(build_schema,
+                              lambda request: request.GET['tenant'])
+    wsgi = graphql_wsgi_dynamic(lambda request: (None, None, False),
+                                registry=registry)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{test}', 'tenant': 'test'})
+    assert response.json == {'data': {'test': 'Hello World'}}
+    c.get('/', {'query': '{thrower}', 'tenant': 'deadline'}, status=400)
+    response = c.get('/', {'query': '{slow}', 'tenant': 'deadline'})
+    assert response.json == {'data': {'slow': 'Slow'}}
+    c.get('/', {'query': '{test}', 'tenant': 'test'})
+
+    assert built == ['test', 'deadline']
+    assert registry.tenants() == ['deadline', 'test']
+
+
+def test_registry_evicts_over_memory_budget():
+    registry = SchemaRegistry(lambda tenant: TestSchema,
+                              lambda request: request.GET['tenant'],
+                              memory_budget=1)
+    wsgi = graphql_wsgi_dynamic(lambda request: (None, None, False),
+                                registry=registry)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}', 'tenant': 'a'})
+    c.get('/', {'query': '{test}', 'tenant': 'b'})
+
+    assert registry.tenants() == ['b']
+
+
+def test_registry_estimates_schema_size_only_with_memory_budget():
+    registry = SchemaRegistry(lambda tenant: TestSchema,
+                              lambda request: request.GET['tenant'])
+    wsgi = graphql_wsgi_dynamic(lambda request: (None, None, False),
+                                registry=registry)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}', 'tenant': 'a'})
+    state = registry.states['a']
+    assert state.schema_size is None
+    assert state.size() > 0
+    assert state.schema_size > 0
+
+
+def test_registry_evicts_idle_tenants():
+    registry = SchemaRegistry(lambda tenant: TestSchema,
+                              lambda request: request.GET['tenant'],
+                              max_idle=0.01)
+    wsgi = graphql_wsgi_dynamic(lambda request: (None, None, False),
+                                registry=registry)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}', 'tenant': 'a'})
+    c.get('/', {'query': '{test}', 'tenant': 'b'})
+    assert registry.tenants() == ['a', 'b']
+    time.sleep(0.02)
+    c.get('/', {'query': '{test}', 'tenant': 'c'})
+    assert registry.tenants() == ['c']
+
+
+def test_document_cache_skips_parse_and_validate():
+    slow_log = SlowLog(threshold=0)
+    wsgi = graphql_wsgi(TestSchema, slow_log=slow_log)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}'})
+    c.get('/', {'query': '{test}'})
+    c.get('/', {'query': '{unknown}'}, status=400)
+    response = c.get('/', {'query': '{unknown}'}, status=400)
+
+    assert response.json['errors'][0]['message'] == (
+        'Cannot query field "unknown" on type "Root".')
+    assert [sorted(entry['phases']) for entry in slow_log.entries] == [
+        ['execute', 'parse', 'serialize', 'validate'],
+        ['execute', 'serialize'],
+        ['parse', 'serialize', 'validate'],
+        ['serialize'],
+    ]
+
+
+def test_rate_limiter_charges_operation_cost():
+    rate_limiter = RateLimiter(rate=0.001, capacity=3)
+    wsgi = graphql_wsgi(TestSchema, rate_limiter=rate_limiter)
+
+    c = Client(wsgi, extra_environ={'REMOTE_ADDR': '10.0.0.2'})
+    c.get('/', {'query': '{a: test, b: test}'})
+    c.get('/', {'query': '{test}'})
+    response = c.get('/', {'query': '{test}'}, status=429)
+
+    assert response.headers['Retry-After'] == '1000'
+    assert response.json == {
+        'errors': [{'message': 'Rate limit exceeded.'}]
+    }
+
+    c.get('/', {'query': '{test}'},
+          extra_environ={'REMOTE_ADDR': '10.0.0.1'})
+
+
+def test_rate_limiter_rejects_operations_over_capacity():
+    wsgi = graphql_wsgi(TestSchema,
+                        rate_limiter=RateLimiter(rate=1, capacity=1))
+
+    c = Client(wsgi, extra_environ={'REMOTE_ADDR': '10.0.0.2'})
+    response = c.get('/', {'query': '{a: test, b: test}'}, status=400)
+
+    assert response.json == {
+        'errors': [{'message': 'Query cost of 2 exceeds the maximum of 1.'}]
+    }
+
+
+def test_rate_limiter_with_sqlite_store(tmpdir):
+    path = str(tmpdir.join('buckets.db'))
+
+    def app():
+        store = SQLiteTokenBucketStore(path)
+        return Client(graphql_wsgi(
+            TestSchema,
+            rate_limiter=RateLimiter(rate=0.001, capacity=2, store=store)),
+            extra_environ={'REMOTE_ADDR': '10.0.0.2'})
+
+    app().get('/', {'query': '{test}'})
+    app().get('/', {'query': '{test}'})
+    app().get('/', {'query': '{test}'}, status=429)
+
+
+def test_token_bucket_stores_drop_refilled_buckets(tmpdir):
+    memory_store = TokenBucketStore()
+    sqlite_store = SQLiteTokenBucketStore(str(tmpdir.join('buckets.db')))
+
+    def keys(store):
+        if store is memory_store:
+            return sorted(store.buckets)
+        return sorted(key for key, in store.connection().execute(
+            'SELECT key FROM buckets'))
+
+    for store in [memory_store, sqlite_store]:
+        assert store.consume('a', 1, rate=100, capacity=1) == 0
+        time.sleep(0.02)
+        assert store.consume('b', 1, rate=100, capacity=1) == 0
+        assert keys(store) == ['b']
+
+
+def async_resolver(root, args, *_):
+    return asyncio.sleep(float(args.get('delay', 0.1)),
+                         result='Hello ' + args.get('who', 'World'))
+
+
+AsyncSchema = GraphQLSchema(
+    query=GraphQLObjectType(
+        'Root',
+        fields=lambda: {
+            'test': GraphQLField(
+                GraphQLString,
+                args={
+                    'who': GraphQLArgument(
+                        type=GraphQLString
+                    ),
+                    'delay': GraphQLArgument(
+                        type=GraphQLString
+                    )
+                },
+                resolver=async_resolver
+            ),
+            'sync': GraphQLField(
+                GraphQLString,
+                resolver=resolver
+            ),
+        }
+    )
+)
+
+
+@requires_asyncio
+def test_async_resolvers_run_concurrently():
+    wsgi = graphql_wsgi(AsyncSchema, async_resolvers=True)
+
+    c = Client(wsgi)
+    start = time.time()
+    response = c.get('/', {'query': '''{
+      a: test(who: "A"), b: test(who: "B"), c: test(who: "C"), sync
+    }'''})
+
+    assert time.time() - start < 0.25
+    assert response.json == {
+        'data': {
+            'a': 'Hello A',
+            'b': 'Hello B',
+            'c': 'Hello C',
+            'sync': 'Hello World',
+        }
+    }
+
+
+@requires_asyncio
+def test_async_resolvers_with_middleware():
+    def upper(next, root, args, context, info):
+        return next(root, args, context, info).then(
+            lambda value: value.upper())
+
+    wsgi = graphql_wsgi(AsyncSchema, async_resolvers=True,
+                        middleware=[upper], timeout=10)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{test, sync}'})
+
+    assert response.json == {
+        'data': {
+            'test': 'HELLO WORLD',
+            'sync': 'HELLO WORLD',
+        }
+    }
+
+
+@requires_asyncio
+def test_async_resolvers_cancelled_at_deadline():
+    wsgi = graphql_wsgi(AsyncSchema, async_resolvers=True, timeout=0.05)
+
+    c = Client(wsgi)
+    start = time.time()
+    response = c.get('/', {'query': '{slow: test(delay: "10"), sync}'})
+
+    assert time.time() - start < 1
+    assert response.json == {
+        'data': {
+            'slow': None,
+            'sync': 'Hello World',
+        },
+        'errors': [{
+            'message': ('Execution deadline of 0.05 seconds exceeded; '
+                        '1 fields were not resolved.')
+        }]
+    }
+
+
+def test_max_response_size_aborts_large_lists():
+    schema = synthetic_schema(types=3, list_size=1000)
+    query = synthetic_query(schema, depth=2)
+    wsgi = graphql_wsgi(schema, max_response_size=500)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': query}, status=400)
+
+    assert response.json == {
+        'errors': [{
+            'message': 'Response exceeds the maximum size of 500 bytes.'
+        }]
+    }
+
+
+def test_max_response_size_configured_by_request():
+    def options_from_request(request):
+        return (TestSchema, None, False, None, None,
+                int(request.GET['max_size']))
+
+    wsgi = graphql_wsgi_dynamic(options_from_request)
+
+    c = Client(wsgi)
+    response = c.get('/', {'query': '{test}', 'max_size': '100'})
+    assert response.json == {'data': {'test': 'Hello World'}}
+
+    c.get('/', {'query': '{test}', 'max_size': '10'}, status=400)
+
+
+def test_json_dump_limited():
+    d = {'data': {'test': 'x' * 100}}
+
+    assert json_dump(d, True, 1000) == json_dump(d, True)
+    assert json_dump(d, False, 1000) == json_dump(d, False)
+    with pytest.raises(ResponseTooLarge):
+        json_dump(d, False, 50)
+
+
+def test_rate_limiter_ignores_forwarded_for():
+    wsgi = graphql_wsgi(TestSchema,
+                        rate_limiter=RateLimiter(rate=0.001, capacity=1))
+
+    c = Client(wsgi, extra_environ={'REMOTE_ADDR': '10.0.0.2'})
+    c.get('/', {'query': '{test}'},
+          headers={'X-Forwarded-For': '192.168.0.1'})
+    c.get('/', {'query': '{test}'},
+          headers={'X-Forwarded-For': '192.168.0.2'}, status=429)
+
+
+def test_max_response_size_applies_to_cached_introspection():
+    def options_from_request(request):
+        return (TestSchema, None, False, None, None,
+                int(request.GET['max_size']))
+
+    wsgi = graphql_wsgi_dynamic(options_from_request)
+
+    c = Client(wsgi)
+    c.get('/', {'query': introspection_query, 'max_size': '100000'})
+    response = c.get('/', {'query': introspection_query, 'max_size': '100'},
+                     status=400)
+
+    assert response.json == {
+        'errors': [{
+            'message': 'Response exceeds the maximum size of 100 bytes.'
+        }]
+    }
+
+
+def test_document_cache_shares_validation_of_equivalent_queries():
+    slow_log = SlowLog(threshold=0)
+    wsgi = graphql_wsgi(TestSchema, slow_log=slow_log)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}'})
+    response = c.get('/', {'query': '# comment\n{ test }'})
+
+    assert response.json == {'data': {'test': 'Hello World'}}
+    assert [sorted(entry['phases']) for entry in slow_log.entries] == [
+        ['execute', 'parse', 'serialize', 'validate'],
+        ['execute', 'parse', 'serialize'],
+    ]
+
+
+@requires_tracemalloc
+def test_memory_profiler_not_sampled_without_slow_log():
+    memory_profiler = MemoryProfiler(every=1)
+    wsgi = graphql_wsgi(TestSchema, memory_profiler=memory_profiler)
+
+    c = Client(wsgi)
+    c.get('/', {'query': '{test}'})
+
+    assert memory_profiler.count == 0
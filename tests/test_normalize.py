@@ -0,0 +1,53 @@
+from graphql.language.parser import parse
+from graphql_wsgi import normalize, document_hash
+
+
+def test_normalize_minifies():
+    document = parse('''
+      # a comment
+      query {
+        test(who: "Dolly"),
+        other
+      }
+    ''')
+
+    assert normalize(document) == ('{test(who:"Dolly") other}', {})
+
+
+def test_normalize_sorts_definitions_and_arguments():
+    first = parse('''
+      fragment b on Root { b }
+      query hello($who: String = "World") { ...a, ...b, f(y: 1, x: 2) }
+      fragment a on Root { a }
+    ''')
+    second = parse('''
+      fragment a on Root { a }
+      fragment b on Root { b }
+      query hello($who: String = "World") { ...a ...b f(x: 2, y: 1) }
+    ''')
+
+    text, literals = normalize(first)
+    assert text == ('query hello($who:String="World"){...a ...b f(x:2,y:1)} '
+                    'fragment a on Root{a} fragment b on Root{b}')
+    assert normalize(second) == (text, literals)
+    assert document_hash(first) == document_hash(second)
+
+
+def test_normalize_hoists_literals():
+    document = parse('{ test(who: "Dolly") @include(if: true), '
+                     'list(items: [1, 2.5], input: {b: ENUM, a: "x"}) }')
+
+    text, literals = normalize(document, hoist_literals=True)
+    assert text == ('{test(who:$_0)@include(if:$_1) '
+                    'list(input:{a:$_2,b:ENUM},items:[$_3,$_4])}')
+    assert literals == {
+        '_0': 'Dolly', '_1': True, '_2': 'x', '_3': 1, '_4': 2.5}
+
+
+def test_document_hash_with_hoisted_literals():
+    dolly = parse('{ test(who: "Dolly") }')
+    world = parse('{ test(who: "World") }')
+
+    assert document_hash(dolly) != document_hash(world)
+    assert (document_hash(dolly, hoist_literals=True) ==
+            document_hash(world, hoist_literals=True))
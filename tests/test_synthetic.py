@@ -0,0 +1,61 @@
+from webtest import TestApp as Client
+from graphql_wsgi import graphql_wsgi
+from graphql_wsgi.benchmark import run_scenario
+from graphql_wsgi.synthetic import synthetic_schema, synthetic_query
+
+
+def test_synthetic_query():
+    schema = synthetic_schema(types=5, fields=2, links=1, list_size=2)
+    query = synthetic_query(schema, depth=2, fields=1, links=1)
+
+    c = Client(graphql_wsgi(schema))
+    response = c.get('/', {'query': query})
+
+    assert response.json == {
+        'data': {
+            'type0': {
+                'field0': '0.field0',
+                'list0': [
+                    {'field0': '0.field0'},
+                    {'field0': '1.field0'},
+                ]
+            }
+        }
+    }
+
+
+def test_synthetic_query_with_fragments():
+    schema = synthetic_schema(types=5, fields=2, links=1)
+    query = synthetic_query(schema, depth=2, fields=1, links=1, lists=False,
+                            fragments=True)
+
+    assert query == ('{ type0 { ...Type0Fields link0 { ...Type1Fields } } }\n'
+                     'fragment Type0Fields on Type0 { field0 }\n'
+                     'fragment Type1Fields on Type1 { field0 }')
+
+    c = Client(graphql_wsgi(schema))
+    response = c.get('/', {'query': query})
+
+    assert response.json == {
+        'data': {
+            'type0': {
+                'field0': '0.field0',
+                'link0': {'field0': '1.field0'},
+            }
+        }
+    }
+
+
+def test_large_synthetic_schema():
+    schema = synthetic_schema(types=2000)
+
+    assert schema.get_type('Type1999') is not None
+
+
+def test_run_scenario():
+    result = run_scenario({'name': 'test', 'schema': {'types': 3}},
+                          requests=3, warmup=1)
+
+    assert result['requests'] == 3
+    assert result['p50'] <= result['p99']
+    assert result['response_size'] > 0